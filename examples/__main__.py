@@ -0,0 +1,30 @@
+"""Aggregate example runner: `python -m examples [anthropic|openai]`.
+
+Imports every test_* module for the chosen provider (registering each
+@test-decorated example) and runs them all concurrently on one event loop
+via run_all(), instead of paying interpreter + loop startup per file.
+"""
+
+import importlib
+import pkgutil
+import sys
+
+from .utils import run_all
+
+
+def main() -> None:
+    provider = sys.argv[1] if len(sys.argv) > 1 else "anthropic"
+    package = importlib.import_module(f"examples.{provider}")
+    for info in pkgutil.iter_modules(package.__path__):
+        if info.name.startswith("test_"):
+            importlib.import_module(f"examples.{provider}.{info.name}")
+
+    warmup = None
+    if provider == "anthropic":
+        from .anthropic.config import warmup  # pre-open the API connection
+
+    run_all(warmup)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,58 @@
 """Shared client and model settings for Anthropic examples."""
 
+import asyncio
+import atexit
+import contextlib
 import os
+import threading
+import types
 
-KWARGS = {"model": os.getenv("MODEL", "claude-haiku-4-5-20251001"), "max_tokens": 4096}
+import httpx2
+from anthropic import AsyncAnthropic
+
+# Computed once at import and frozen: examples share this across every llm()
+# call, so no test can accidentally mutate another's settings.
+_KWARGS = {"model": os.getenv("MODEL", "claude-haiku-4-5-20251001"), "max_tokens": 4096}
+KWARGS = types.MappingProxyType(_KWARGS)
+
+# One pooled client per event loop: reusing the httpx connection pool avoids a
+# fresh TCP/TLS handshake on the first LLM call of every example.
+_clients: dict[int, AsyncAnthropic] = {}
+_clients_lock = threading.Lock()
+
+
+def client() -> AsyncAnthropic:
+    """Return the pooled AsyncAnthropic client for the running event loop."""
+    key = id(asyncio.get_running_loop())
+    with _clients_lock:
+        if key not in _clients:
+            # HTTP/2 multiplexes concurrent examples over one socket
+            # httpx2 is the anthropic SDK's httpx fork; it is what the
+            # client accepts as http_client
+            http_client = httpx2.AsyncClient(
+                http2=True,
+                limits=httpx2.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60,
+                ),
+            )
+            _clients[key] = AsyncAnthropic(http_client=http_client)
+        return _clients[key]
+
+
+async def warmup() -> None:
+    """Pre-resolve DNS and finish the TLS handshake to the API host.
+
+    Run once at suite startup so the first example doesn't pay connection
+    setup inside its measured path. Any response (even a 4xx) is fine."""
+    c = client()
+    with contextlib.suppress(Exception):
+        await c._client.head(str(c.base_url))
+
+
+@atexit.register
+def _close_clients() -> None:
+    for c in _clients.values():
+        with contextlib.suppress(Exception):
+            asyncio.run(c.close())
@@ -1,15 +1,20 @@
 import logging
 
-from anthropic import AsyncAnthropic
-
-from nkd_agents.anthropic import llm, user
+from nkd_agents.anthropic import compiled_tools, llm, user
 
 from ..utils import test
-from .config import KWARGS
+from .config import KWARGS, client
 
 logger = logging.getLogger(__name__)
 
 
+_WEATHER_DB = {
+    "Paris": "72°F, sunny",
+    "London": "60°F, cloudy",
+    "New York": "50°F, rainy",
+}
+
+
 async def get_weather(city: str) -> str:
     """Get the current weather for a city.
     Args:
@@ -17,12 +22,10 @@ async def get_weather(city: str) -> str:
     Returns:
         The weather for the city.
     """
-    weather_db = {
-        "Paris": "72°F, sunny",
-        "London": "60°F, cloudy",
-        "New York": "50°F, rainy",
-    }
-    return weather_db.get(city, f"Weather data not available for {city}")
+    return _WEATHER_DB.get(city, f"Weather data not available for {city}")
+
+
+TOOLS = compiled_tools(get_weather)
 
 
 @test("basic")
@@ -33,16 +36,15 @@ async def main():
     1. Simple string prompt with no tools
     2. Basic tool call
     """
-    client = AsyncAnthropic()
-    prompt = "What's the weather in Paris?"
+    logger.debug("steps: basic (no tools), tool call")
+    msg = user("What's the weather in Paris?")
     # 1. No tools
-    logger.info("1. Basic usage (no tools)")
-    _ = await llm(client, [user(prompt)], **KWARGS)
+    _ = await llm(client(), [msg], **KWARGS)
 
     # 2. With tools
-    logger.info("2. Tool call")
-    response = await llm(client, [user(prompt)], fns=[get_weather], **KWARGS)
-    assert "sunny" in response.lower() and "72" in response.lower()
+    response = await llm(client(), [msg], fns=[get_weather], tools=TOOLS, **KWARGS)
+    lowered = response.lower()
+    assert "sunny" in lowered and "72" in lowered
 
 
 if __name__ == "__main__":
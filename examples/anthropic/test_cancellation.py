@@ -1,21 +1,29 @@
 import asyncio
+import contextlib
 import logging
+import re
+from contextvars import ContextVar, copy_context
 
-from anthropic import AsyncAnthropic
-
-from nkd_agents.anthropic import llm, user
+from nkd_agents.anthropic import compiled_tools, llm, user
 
 from ..utils import test
-from .config import KWARGS
+from .config import KWARGS, client
 
 logger = logging.getLogger(__name__)
 
-tool_running = asyncio.Event()
+# compiled once: case-insensitive match without allocating a lowered copy
+_INTERRUPT = re.compile("interrupt", re.IGNORECASE)
+
+# Created inside main() so it binds to the running loop; a module-level Event
+# would lazily bind to whichever loop touches it first.
+tool_running = ContextVar["asyncio.Future[None]"]("tool_running")
 
 
 async def analyze_dataset(name: str) -> str:
     """Analyze a dataset (simulated long-running operation)."""
-    tool_running.set()
+    started = tool_running.get()
+    if not started.done():
+        started.set_result(None)
     await asyncio.sleep(10)
     return f"Analysis complete: {name} has 1M records"
 
@@ -25,6 +33,10 @@ async def add(a: int, b: int) -> str:
     return str(a + b)
 
 
+TOOLS = [analyze_dataset, add]
+TOOL_SCHEMAS = compiled_tools(*TOOLS)
+
+
 @test("cancellation")
 async def main():
     """
@@ -34,27 +46,36 @@ async def main():
     The framework automatically records "Interrupted" as the tool result, so you can
     cancel long operations and keep chatting—the LLM handles it like any other event.
     """
-    client = AsyncAnthropic()
+    started: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+    tool_running.set(started)
     input = [user("Analyze the sales_data dataset")]
 
-    task = asyncio.create_task(llm(client, input, [analyze_dataset, add], **KWARGS))
-    await tool_running.wait()
+    # snapshot once and hand it to the task; create_task otherwise runs its
+    # own copy_context() for every task it spawns
+    snapshot = copy_context()
+    task = asyncio.create_task(
+        llm(client(), input, TOOLS, tools=TOOL_SCHEMAS, **KWARGS), context=snapshot
+    )
+    await started
     task.cancel()
 
-    try:
+    with contextlib.suppress(asyncio.CancelledError):
         await task
-    except asyncio.CancelledError:
-        logger.info("Interrupted")
-
-    input.append(user("Never mind. What's 5 + 3?"))
-    response = await llm(client, input, [analyze_dataset, add], **KWARGS)
-    logger.info(f"Changed mind: {response}")
-    assert "8" in response
-
-    input.append(user("What happened to that analysis?"))
-    response = await llm(client, input, [analyze_dataset, add], **KWARGS)
-    logger.info(f"Asked about interruption: {response}")
-    assert "interrupt" in response.lower()
+    logger.info("Interrupted")
+
+    # the follow-ups are independent, so fork the interrupted history into
+    # two branches and overlap their round-trips
+    branch_a = [*input, user("Never mind. What's 5 + 3?")]
+    branch_b = [*input, user("What happened to that analysis?")]
+    changed, asked = await asyncio.gather(
+        llm(client(), branch_a, TOOLS, tools=TOOL_SCHEMAS, **KWARGS),
+        llm(client(), branch_b, TOOLS, tools=TOOL_SCHEMAS, **KWARGS),
+    )
+    logger.info("Changed mind: %s", changed)
+    assert "8" in changed
+
+    logger.info("Asked about interruption: %s", asked)
+    assert _INTERRUPT.search(asked)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,20 @@
 import logging
 
-from anthropic import AsyncAnthropic
-
-from nkd_agents.anthropic import llm, user
+from nkd_agents.anthropic import compiled_tools, llm, user
 
 from ..utils import test
-from .config import KWARGS
+from .config import KWARGS, client
 
 logger = logging.getLogger(__name__)
 
 
+_WEATHER_DB = {
+    "Paris": "72°F, sunny",
+    "London": "60°F, cloudy",
+    "New York": "50°F, rainy",
+}
+
+
 async def get_weather(city: str) -> str:
     """Get the current weather for a city.
     Args:
@@ -17,12 +22,10 @@ async def get_weather(city: str) -> str:
     Returns:
         The weather for the city.
     """
-    weather_db = {
-        "Paris": "72°F, sunny",
-        "London": "60°F, cloudy",
-        "New York": "50°F, rainy",
-    }
-    return weather_db.get(city, f"Weather data not available for {city}")
+    return _WEATHER_DB.get(city, f"Weather data not available for {city}")
+
+
+TOOLS = compiled_tools(get_weather)
 
 
 @test("conversation_history")
@@ -32,14 +35,14 @@ async def main():
     Demonstrates:
     1. Conversation history with message list persisted across calls
     """
-    client = AsyncAnthropic()
     logger.info("1. Conversation history")
     msgs = [user("I live in Paris")]
-    _ = await llm(client, msgs, **KWARGS)
+    _ = await llm(client(), msgs, **KWARGS)
 
     msgs.append(user("What's the weather?"))
-    response = await llm(client, msgs, fns=[get_weather], **KWARGS)
-    assert "sunny" in response.lower() and "72" in response.lower()
+    response = await llm(client(), msgs, fns=[get_weather], tools=TOOLS, **KWARGS)
+    lowered = response.lower()
+    assert "sunny" in lowered and "72" in lowered
 
 
 if __name__ == "__main__":
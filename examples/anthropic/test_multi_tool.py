@@ -1,12 +1,10 @@
 import logging
 from typing import Literal
 
-from anthropic import AsyncAnthropic
-
-from nkd_agents.anthropic import llm, user
+from nkd_agents.anthropic import compiled_tools, llm, user
 
 from ..utils import test
-from .config import KWARGS
+from .config import KWARGS, client
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +26,10 @@ async def calculate_total_cost(flight_price: int, hotel_price: int, nights: int)
     return f"${total}"
 
 
+TOOLS = [search_flights, search_hotels, calculate_total_cost]
+TOOL_SCHEMAS = compiled_tools(*TOOLS)
+
+
 @test("multi_tool")
 async def main():
     """
@@ -40,14 +42,13 @@ async def main():
     The framework's agentic loop handles the complexity: tool A's output feeds into
     the decision to call tool B, then synthesize into a final answer.
     """
-    client = AsyncAnthropic()
     prompt = "I want to visit Tokyo or Osaka from New York for 4 nights. I'm on a budget. What's the cheapest total cost?"
-    tools = [search_flights, search_hotels, calculate_total_cost]
-
-    response = await llm(client, [user(prompt)], fns=tools, **KWARGS)
-    assert "450" in response or "$450" in response
-    assert "60" in response or "$60" in response
-    assert "690" in response or "$690" in response
+    response = await llm(
+        client(), [user(prompt)], fns=TOOLS, tools=TOOL_SCHEMAS, **KWARGS
+    )
+    assert "450" in response
+    assert "60" in response
+    assert "690" in response
 
 
 if __name__ == "__main__":
@@ -1,12 +1,12 @@
+import asyncio
 import logging
 from contextvars import ContextVar
 
-from anthropic import AsyncAnthropic
-
-from nkd_agents.anthropic import llm, user
+from nkd_agents.anthropic import compiled_tools, llm, user
+from nkd_agents.ctx import ctx
 
 from ..utils import test
-from .config import KWARGS
+from .config import KWARGS, client
 
 logger = logging.getLogger(__name__)
 
@@ -24,22 +24,29 @@ async def greet(name: str) -> str:
     return greetings.get(lang, f"Hi, {name}!")
 
 
+TOOLS = compiled_tools(greet)
+
+
 @test("tool_ctx")
 async def main():
     """Test context variable isolation with tools.
 
     Key lesson: Context variables are inherited by tools run via asyncio.gather().
-    Set the context var before calling llm(), tools automatically see the correct value.
+    Each task snapshots the context at creation, so two concurrent llm() calls
+    can hold different values of the same ContextVar without clobbering each other.
     """
-    client = AsyncAnthropic()
     prompt = "Greet Alice"
-    current_language.set("english")
-    response_en = await llm(client, [user(prompt)], fns=[greet], **KWARGS)
-    assert "Hello" in response_en or "hello" in response_en.lower()
-
-    current_language.set("spanish")
-    response_es = await llm(client, [user(prompt)], fns=[greet], **KWARGS)
-    assert "Hola" in response_es or "hola" in response_es.lower()
+    async with asyncio.TaskGroup() as tg:
+        with ctx(current_language, "english"):
+            task_en = tg.create_task(
+                llm(client(), [user(prompt)], fns=[greet], tools=TOOLS, **KWARGS)
+            )
+        with ctx(current_language, "spanish"):
+            task_es = tg.create_task(
+                llm(client(), [user(prompt)], fns=[greet], tools=TOOLS, **KWARGS)
+            )
+    assert "hello" in task_en.result().lower()
+    assert "hola" in task_es.result().lower()
 
 
 if __name__ == "__main__":
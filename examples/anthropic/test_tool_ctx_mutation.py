@@ -2,19 +2,21 @@ import logging
 from contextvars import ContextVar
 from dataclasses import dataclass
 
-from anthropic import AsyncAnthropic
-
 from nkd_agents.anthropic import llm, user
 
 from ..utils import test
-from .config import KWARGS
+from .config import KWARGS, client
 
 logger = logging.getLogger(__name__)
 
 
 @dataclass(frozen=False)
 class Document:
-    content: str
+    buf: bytearray
+
+    @property
+    def content(self) -> str:
+        return self.buf.decode("utf-8")
 
 
 document = ContextVar[Document | None]("document", default=None)
@@ -27,10 +29,14 @@ async def edit_string(old_str: str, new_str: str) -> str:
 
     if old_str == new_str:
         return "Error: old_str and new_str must be different"
-    if old_str not in doc.content:
+
+    old = old_str.encode("utf-8")
+    idx = doc.buf.find(old)
+    if idx < 0:
         return "Error: old_str not found in content"
 
-    doc.content = doc.content.replace(old_str, new_str, 1)
+    # in-place splice on the bytearray: one scan, no full-buffer string copy
+    doc.buf[idx : idx + len(old)] = new_str.encode("utf-8")
     return f"Success: Replaced '{old_str}' with '{new_str}'"
 
 
@@ -42,15 +48,14 @@ async def main():
     object (like a dataclass with frozen=False), tools can mutate it in-place and
     mutations remain visible after llm() returns.
     """
-    client = AsyncAnthropic()
-    doc = Document(content="The quick brown sloth jumps over the lazy dog")
-    logger.info(f"Before: {doc.content}")
+    doc = Document(buf=bytearray(b"The quick brown sloth jumps over the lazy dog"))
+    logger.info("Before: %s", doc.content)
 
     document.set(doc)
     prompt = f"Current document: '{doc.content}'\n\nThat animal can't jump! Replace it with 'cat'"
-    await llm(client, [user(prompt)], fns=[edit_string], **KWARGS)
+    await llm(client(), [user(prompt)], fns=[edit_string], **KWARGS)
 
-    logger.info(f"After: {doc.content}")
+    logger.info("After: %s", doc.content)
 
     expected = "The quick brown cat jumps over the lazy dog"
     assert doc.content == expected
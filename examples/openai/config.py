@@ -1,5 +1,37 @@
 """Shared client and model settings for OpenAI examples."""
 
+import asyncio
+import atexit
+import contextlib
 import os
+import threading
+import types
 
-KWARGS = {"model": os.getenv("MODEL", "gpt-5.2"), "max_output_tokens": 4096}
+from openai import AsyncOpenAI
+
+# Computed once at import and frozen: examples share this across every llm()
+# call, so no test can accidentally mutate another's settings.
+MODEL = os.getenv("MODEL", "gpt-5.2")
+_KWARGS = {"model": MODEL, "max_output_tokens": 4096}
+KWARGS = types.MappingProxyType(_KWARGS)
+
+# One pooled client per event loop: reusing the httpx connection pool avoids a
+# fresh TCP/TLS handshake on the first LLM call of every example.
+_clients: dict[int, AsyncOpenAI] = {}
+_clients_lock = threading.Lock()
+
+
+def client() -> AsyncOpenAI:
+    """Return the pooled AsyncOpenAI client for the running event loop."""
+    key = id(asyncio.get_running_loop())
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = AsyncOpenAI()
+        return _clients[key]
+
+
+@atexit.register
+def _close_clients() -> None:
+    for c in _clients.values():
+        with contextlib.suppress(Exception):
+            asyncio.run(c.close())
@@ -1,15 +1,25 @@
 import logging
+import re
 
-from openai import AsyncOpenAI
 from pydantic import BaseModel
 
 from nkd_agents.openai import llm, user
 
 from ..utils import test
-from .config import KWARGS
+from .config import KWARGS, client
 
 logger = logging.getLogger(__name__)
 
+# compiled once: case-insensitive match without allocating a lowered copy
+_SUNNY = re.compile("sunny", re.IGNORECASE)
+
+
+_WEATHER_DB = {
+    "Paris": "72°F, sunny",
+    "London": "60°F, cloudy",
+    "New York": "50°F, rainy",
+}
+
 
 async def get_weather(city: str) -> str:
     """Get the current weather for a city.
@@ -18,12 +28,7 @@ async def get_weather(city: str) -> str:
     Returns:
         The weather for the city.
     """
-    weather_db = {
-        "Paris": "72°F, sunny",
-        "London": "60°F, cloudy",
-        "New York": "50°F, rainy",
-    }
-    return weather_db.get(city, f"Weather data not available for {city}")
+    return _WEATHER_DB.get(city, f"Weather data not available for {city}")
 
 
 class Weather(BaseModel):
@@ -33,6 +38,10 @@ class Weather(BaseModel):
     description: str
 
 
+# merged once at import; the SDK derives Weather's schema inside parse()
+OUTPUT_KWARGS = {"text_format": Weather, **KWARGS}
+
+
 @test("structured_output")
 async def main():
     """Test structured output.
@@ -41,20 +50,18 @@ async def main():
     1. Structured output with Pydantic model
     2. Tool call with structured output
     """
-    client = AsyncOpenAI()
-    kwargs = {"text_format": Weather, **KWARGS}
     input = [user("What's the weather in Paris?")]
     # 1. Structured output
     logger.info("1. Structured output (no tools)")
-    json_str = await llm(client, input, **kwargs)
+    json_str = await llm(client(), input, **OUTPUT_KWARGS)
     weather = Weather.model_validate_json(json_str)
 
     # 2. Tool call with structured output
     logger.info("2. Tool call with structured output")
-    json_str = await llm(client, input, fns=[get_weather], **kwargs)
+    json_str = await llm(client(), input, fns=[get_weather], **OUTPUT_KWARGS)
     weather = Weather.model_validate_json(json_str)
     assert weather.temperature == 72
-    assert "sunny" in weather.description.lower()
+    assert _SUNNY.search(weather.description)
 
 
 if __name__ == "__main__":
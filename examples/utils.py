@@ -1,15 +1,53 @@
 """Utilities for example tests."""
 
 import asyncio
+import atexit
+import inspect
 import logging
 from collections.abc import Coroutine
 from typing import Any, Callable
 
-from nkd_agents.logging import GREEN, RESET, configure_logging, logging_ctx
+from nkd_agents.logging import GREEN, RED, RESET, configure_logging, logging_ctx
 from nkd_agents.utils import load_env
 
 logger = logging.getLogger(__name__)
 
+try:
+    # Optional: libuv-based loop cuts per-await overhead for httpx-backed calls
+    import uvloop
+
+    _loop_factory = uvloop.new_event_loop
+except ImportError:
+    _loop_factory = asyncio.new_event_loop
+
+# (name, coroutine function) for every @test-decorated example seen at import
+_registry: list[tuple[str, Callable[[], Coroutine[Any, Any, None]]]] = []
+
+_runner: asyncio.Runner | None = None
+
+_initialized = False
+
+
+def _init() -> None:
+    """Idempotent per-process setup: parse .env and configure logging once."""
+    global _initialized
+    if not _initialized:
+        load_env()
+        configure_logging()
+        _initialized = True
+
+
+def runner() -> asyncio.Runner:
+    """Lazily create the asyncio.Runner shared by every example in this process.
+
+    One persistent loop (instead of asyncio.run per test) amortizes loop setup
+    and lets the pooled client keep its connections alive between tests."""
+    global _runner
+    if _runner is None:
+        _runner = asyncio.Runner(loop_factory=_loop_factory)
+        atexit.register(_runner.close)
+    return _runner
+
 
 def test(
     test_name: str,
@@ -19,15 +57,66 @@ def test(
     def decorator(
         func: Callable[..., Coroutine[Any, Any, None]],
     ) -> Callable[..., None]:
-        def wrapper(*args: Any, **kwargs: Any) -> None:
-            load_env()
-            configure_logging()
+        _registry.append((test_name, func))
+
+        def run(coro: Coroutine[Any, Any, None]) -> None:
+            _init()
             logging_ctx.set({"test": test_name})
 
-            asyncio.run(func(*args, **kwargs))
+            try:
+                runner().run(coro)
+            except Exception:
+                # logger.exception defers traceback formatting to the handler
+                logger.exception(f"{RED}✗ Test failed{RESET}")
+                raise
             logger.info(f"{GREEN}✓ Test passed!{RESET}")
-            return None
+
+        if inspect.signature(func).parameters:
+
+            def wrapper(*args: Any, **kwargs: Any) -> None:
+                run(func(*args, **kwargs))
+        else:
+            # every example calls main() with no args; skip variadic unpacking
+            def wrapper() -> None:  # type: ignore[misc]
+                run(func())
 
         return wrapper
 
     return decorator
+
+
+async def _run_registered(
+    test_name: str, func: Callable[[], Coroutine[Any, Any, None]]
+) -> None:
+    logging_ctx.set({"test": test_name})
+    await func()
+    logger.info("%s✓ %s passed!%s", GREEN, test_name, RESET)
+
+
+def run_all(warmup: Callable[[], Coroutine[Any, Any, None]] | None = None) -> None:
+    """Run every registered example concurrently on the shared loop.
+
+    Examples are I/O-bound and independent, so overlapping their network
+    latency turns total runtime from the sum of RTTs into the max. An
+    optional warmup coroutine (e.g. config.warmup) runs first to pre-open
+    the API connection."""
+    _init()
+
+    async def gather_all() -> list[Any]:
+        if warmup is not None:
+            await warmup()
+        return await asyncio.gather(
+            *(_run_registered(name, func) for name, func in _registry),
+            return_exceptions=True,
+        )
+
+    results = runner().run(gather_all())
+    failures = [
+        (name, r)
+        for (name, _), r in zip(_registry, results)
+        if isinstance(r, BaseException)
+    ]
+    for test_name, exc in failures:
+        logger.error("%s✗ %s failed: %r%s", RED, test_name, exc, RESET)
+    if failures:
+        raise SystemExit(1)
@@ -1,9 +1,16 @@
 import asyncio
 import base64
+import functools
 import logging
-from typing import Any, Awaitable, Callable, Iterable, Sequence
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Sequence
 
-from anthropic import AsyncAnthropic, AsyncAnthropicVertex, transform_schema
+from anthropic import (
+    AsyncAnthropic,
+    AsyncAnthropicVertex,
+    RateLimitError,
+    transform_schema,
+)
 from anthropic.types import (
     Base64ImageSourceParam,
     Base64PDFSourceParam,
@@ -22,12 +29,53 @@ from .utils import extract_function_params
 
 logger = logging.getLogger(__name__)
 
+_MAX_CONCURRENT = int(os.environ.get("NKD_MAX_CONCURRENT", "10"))
+_MAX_RETRIES = int(os.environ.get("NKD_MAX_RETRIES", "5"))
+_HISTORY_WARN = int(os.environ.get("NKD_HISTORY_WARN", "200"))
+_semaphores: dict[int, asyncio.Semaphore] = {}
+
+
+def _semaphore() -> asyncio.Semaphore:
+    """Per-event-loop cap on in-flight API requests.
+
+    Keyed on the running loop because asyncio primitives bind to whichever
+    loop first awaits them."""
+    key = id(asyncio.get_running_loop())
+    if key not in _semaphores:
+        _semaphores[key] = asyncio.Semaphore(_MAX_CONCURRENT)
+    return _semaphores[key]
+
+
+async def _create(
+    client: AsyncAnthropic | AsyncAnthropicVertex,
+    messages: list[MessageParam],
+    kwargs: dict[str, Any],
+) -> Message:
+    """Create a message under the concurrency cap, backing off on 429s.
+
+    Sleeps for the server's Retry-After when present, else 2**attempt
+    seconds; the final attempt propagates the error to the caller."""
+    async with _semaphore():
+        for attempt in range(_MAX_RETRIES):
+            try:
+                return await client.messages.create(messages=messages, **kwargs)
+            except RateLimitError as e:
+                delay = float(e.response.headers.get("retry-after", 2**attempt))
+                logger.warning("Rate limited; retrying in %.1fs", delay)
+                await asyncio.sleep(delay)
+        return await client.messages.create(messages=messages, **kwargs)
+
 
 def user(content: str) -> MessageParam:
     "Take a string and return a full Anthropicuser message."
     return {"role": "user", "content": [{"type": "text", "text": content}]}
 
 
+def assistant(content: str) -> MessageParam:
+    "Take a string and return a full Anthropic assistant message."
+    return {"role": "assistant", "content": [{"type": "text", "text": content}]}
+
+
 def output_config(model: type[BaseModel]) -> OutputConfigParam:
     schema = transform_schema(model.model_json_schema())
     return {"format": {"type": "json_schema", "schema": schema}}
@@ -39,13 +87,14 @@ def bytes_to_content(data: bytes, ext: str) -> Content:
     if ext in ("jpeg", "png", "gif", "webp"):
         media_type = f"image/{ext}"
         assert media_type in ("image/jpeg", "image/png", "image/gif", "image/webp")
-        base64_data = base64.standard_b64encode(data).decode("utf-8")
+        # base64 output is pure ASCII; the ascii decoder skips UTF-8 validation
+        base64_data = base64.standard_b64encode(data).decode("ascii")
         source = Base64ImageSourceParam(
             type="base64", media_type=media_type, data=base64_data
         )
         return {"type": "image", "source": source}
     elif ext == "pdf":
-        base64_data = base64.standard_b64encode(data).decode("utf-8")
+        base64_data = base64.standard_b64encode(data).decode("ascii")
         source = Base64PDFSourceParam(
             type="base64", media_type="application/pdf", data=base64_data
         )
@@ -55,8 +104,12 @@ def bytes_to_content(data: bytes, ext: str) -> Content:
         return {"type": "text", "text": text}
 
 
+@functools.cache
 def tool_schema(func: Callable[..., Awaitable[str | Iterable[Content]]]) -> ToolParam:
-    """Convert a function to Anthropic's tool JSON schema."""
+    """Convert a function to Anthropic's tool JSON schema.
+
+    Cached per function: tools are module-level and immutable, so the schema
+    is pure in the function object. Callers must not mutate the result."""
     if not func.__doc__:
         raise ValueError(f"Function {func.__name__} must have a docstring")
 
@@ -75,45 +128,159 @@ def tool_schema(func: Callable[..., Awaitable[str | Iterable[Content]]]) -> Tool
     )
 
 
+@functools.cache
+def compiled_tools(
+    *fns: Callable[..., Awaitable[str | Iterable[Content]]],
+) -> tuple[ToolParam, ...]:
+    """Convert functions to tool schemas once per unique tool tuple.
+
+    llm() re-derives schemas from signatures on every call unless "tools" is
+    passed; callers with a fixed tool list can pass compiled_tools(*fns) to
+    skip the repeated inspect-based generation."""
+    return tuple(tool_schema(fn) for fn in fns)
+
+
 def extract_text_and_tool_calls(response: Message) -> tuple[str, list[ToolUseBlock]]:
     """Extract text and tool calls from an Anthropic message."""
-    text, tool_calls = "", []
+    text_parts: list[str] = []
+    tool_calls: list[ToolUseBlock] = []
+    # bind once: skips a LOAD_ATTR per block when responses run long
+    append_text, append_call = text_parts.append, tool_calls.append
+    # thinking streams can run to thousands of tokens; checking the level
+    # once up front skips per-block record creation when INFO is filtered
+    info = logger.isEnabledFor(logging.INFO)
 
     for block in response.content:
-        if block.type == "thinking":
-            logger.info(f"{response.model}: Thinking: {block.thinking}")
-        if block.type == "text":
-            text += block.text
-            logger.info(f"{response.model}: {block.text}")
-        elif block.type == "tool_use":
-            tool_calls.append(block)
+        # block types are mutually exclusive: one chain, at most one match
+        block_type = block.type
+        if block_type == "text":
+            append_text(block.text)
+            if info:
+                logger.info("%s: %s", response.model, block.text)
+        elif block_type == "tool_use":
+            append_call(block)
+        elif block_type == "thinking" and info:
+            logger.info("%s: Thinking: %s", response.model, block.thinking)
+
+    # join once: += on str re-copies the accumulated text per block
+    return "".join(text_parts), tool_calls
+
+
+async def llm_batch(
+    client: AsyncAnthropic,
+    inputs: Sequence[list[MessageParam]],
+    poll_interval: float = 5.0,
+    **kwargs: Any,
+) -> list[str]:
+    """Run many independent conversations through the Message Batches API.
+
+    Batches trade latency for cost and throughput (50% token discount, much
+    higher rate ceilings), so use this for evals and dataset sweeps rather
+    than interactive loops. Single-shot: requests run without tool execution.
+
+    Args:
+        client: Anthropic client instance
+        inputs: One message list per request
+        poll_interval: Seconds between processing_status polls
+        **kwargs: API parameters shared by every request (model, max_tokens, etc.)
+
+    Returns:
+        Extracted text per input, in order; failed requests get an error string.
+    """
+    requests = [
+        {"custom_id": str(i), "params": {"messages": messages, **kwargs}}
+        for i, messages in enumerate(inputs)
+    ]
+    batch = await client.messages.batches.create(requests=requests)  # type: ignore[arg-type]
+    while batch.processing_status != "ended":
+        await asyncio.sleep(poll_interval)
+        batch = await client.messages.batches.retrieve(batch.id)
 
-    return text, tool_calls
+    texts = ["Error: request expired or was canceled"] * len(inputs)
+    async for entry in await client.messages.batches.results(batch.id):
+        if entry.result.type == "succeeded":
+            text, _ = extract_text_and_tool_calls(entry.result.message)
+            texts[int(entry.custom_id)] = text
+        elif entry.result.type == "errored":
+            texts[int(entry.custom_id)] = f"Error: {entry.result.error}"
+    return texts
 
 
 async def tool(
     tool_dict: dict[str, Callable[..., Awaitable[str | Iterable[Content]]]],
     tool_call: ToolUseBlock,
 ) -> str | Iterable[Content]:
+    # LLMs can hallucinate tool names; a .get keeps that local as an error
+    # string (and off the exception path) instead of a raw KeyError
+    fn = tool_dict.get(tool_call.name)
+    if fn is None:
+        return f"Error: unknown tool '{tool_call.name}'"
     try:
-        return await tool_dict[tool_call.name](**tool_call.input)
+        return await fn(**tool_call.input)
     except Exception as e:
         return f"Error calling tool {tool_call.name}: {str(e)}"
 
 
 def format_tool_results(
     tool_calls: list[ToolUseBlock], results: list[str | Iterable[Content]]
-) -> list[MessageParam]:
-    """Format tool results into messages to append to conversation.
+) -> MessageParam:
+    """Format tool results into a single user message to append to conversation.
 
     For Anthropic, tool results are added as a new user message.
+
+    Append the returned message in place (input.append(...)) rather than
+    rebuilding the history; llm() and the CLI share one list per
+    conversation, and rebuilding copies the whole history every turn.
     """
-    content = []
-    for c, r in zip(tool_calls, results):
-        r = [TextBlockParam(type="text", text=r)] if isinstance(r, str) else r
-        b = ToolResultBlockParam(type="tool_result", tool_use_id=c.id, content=r)
-        content.append(b)
-    return [{"role": "user", "content": content}]
+    content = [
+        ToolResultBlockParam(
+            type="tool_result",
+            tool_use_id=c.id,
+            # type() is: tools return concrete str, never subclasses
+            content=[TextBlockParam(type="text", text=r)] if type(r) is str else r,
+        )
+        for c, r in zip(tool_calls, results)
+    ]
+    return {"role": "user", "content": content}
+
+
+def _with_cache_breakpoints(input: list[MessageParam]) -> list[MessageParam]:
+    """Copy input with ephemeral cache breakpoints on the last two messages.
+
+    A request-only overlay: input itself is never touched, so its layout
+    stays identical turn to turn (stable prefixes are what the cache matches
+    on) and concurrent calls can safely share a history prefix. Messages
+    whose blocks aren't plain dicts (e.g. assistant turns appended as SDK
+    block objects mid-loop) are left unmarked."""
+    messages = list(input)
+    for idx in (-1, -2)[: len(messages)]:
+        content = messages[idx]["content"]
+        if isinstance(content, list) and content and isinstance(content[-1], dict):
+            marked = {**content[-1], "cache_control": {"type": "ephemeral"}}
+            messages[idx] = {**messages[idx], "content": [*content[:-1], marked]}
+    return messages
+
+
+def _prepare(
+    fns: Sequence[Callable[..., Awaitable[str | Iterable[Content]]]],
+    kwargs: dict[str, Any],
+) -> dict[str, Callable[..., Awaitable[str | Iterable[Content]]]]:
+    """Build the tool dict and set schema/system prompt-cache breakpoints.
+
+    Shared request setup for llm() and llm_stream()."""
+    tool_dict = {fn.__name__: fn for fn in fns}
+    tools = kwargs.get("tools", [tool_schema(fn) for fn in fns])
+    if tools:
+        # overlay, don't mutate: schemas are cached and shared across calls
+        tools = [*tools[:-1], {**tools[-1], "cache_control": {"type": "ephemeral"}}]
+    kwargs["tools"] = tools
+    if isinstance(kwargs.get("system"), str):
+        kwargs["system"] = [
+            TextBlockParam(
+                type="text", text=kwargs["system"], cache_control={"type": "ephemeral"}
+            )
+        ]
+    return tool_dict
 
 
 async def llm(
@@ -133,21 +300,25 @@ async def llm(
     - Tools must be async functions that return a string OR list of Anthropic content blocks.
     - Tools should handle their own errors and return descriptive, concise error strings.
     - When cancelled, the loop will return "Interrupted" as the result for any cancelled tool calls.
-    - Uses anthropic ephemeral (5min) prompt caching by always setting breakpoint at last message.
+    - Uses anthropic ephemeral (5min) prompt caching by setting breakpoints at the last
+      two messages: the last covers this request, the second-to-last keeps a prefix
+      match alive on the next round once a new turn is appended behind it.
+    - Also sets breakpoints on the system prompt and last tool schema: that prefix is
+      identical across loop rounds (and calls sharing tools), so the API reuses its cache.
     """
-    tool_dict = {fn.__name__: fn for fn in fns}
-    kwargs["tools"] = kwargs.get("tools", [tool_schema(fn) for fn in fns])
+    tool_dict = _prepare(fns, kwargs)
+    warned = False
 
     while True:
-        try:
-            if fns:
-                input[-1]["content"][-1]["cache_control"] = {"type": "ephemeral"}  # type: ignore # TODO: fix this
+        if not warned and len(input) > _HISTORY_WARN:
+            # every turn re-serializes and re-bills the whole list, so cost
+            # grows quadratically with history length
+            logger.warning("History has %d messages; consider compacting", len(input))
+            warned = True
 
-            resp: Message = await client.messages.create(messages=input, **kwargs)
-            logger.info(f"stop_reason={resp.stop_reason}\nusage={resp.usage}")
-        finally:
-            if fns:
-                del input[-1]["content"][-1]["cache_control"]  # type: ignore # TODO: fix this
+        messages = _with_cache_breakpoints(input) if fns else input
+        resp: Message = await _create(client, messages, kwargs)
+        logger.info("stop_reason=%s\nusage=%s", resp.stop_reason, resp.usage)
 
         text, tool_calls = extract_text_and_tool_calls(resp)
         input.append({"role": "assistant", "content": resp.content})
@@ -157,7 +328,49 @@ async def llm(
 
         try:
             results = await asyncio.gather(*[tool(tool_dict, c) for c in tool_calls])
-            input += format_tool_results(tool_calls, results)
+            input.append(format_tool_results(tool_calls, results))
+        except asyncio.CancelledError:
+            input.append(
+                format_tool_results(tool_calls, ["Interrupted"] * len(tool_calls))
+            )
+            raise
+
+
+async def llm_stream(
+    client: AsyncAnthropic | AsyncAnthropicVertex,
+    input: list[MessageParam],
+    fns: Sequence[Callable[..., Awaitable[str | Iterable[Content]]]] = (),
+    **kwargs: Any,
+) -> AsyncIterator[str]:
+    """Run the same agentic loop as llm(), yielding text deltas as they arrive.
+
+    llm() buffers each full response before returning, so long outputs delay
+    downstream work by their whole decode time. This variant streams text
+    incrementally for display while keeping identical tool and caching
+    behavior; use llm() when you need the complete text (e.g. structured
+    output) rather than progressive rendering.
+    """
+    tool_dict = _prepare(fns, kwargs)
+
+    while True:
+        messages = _with_cache_breakpoints(input) if fns else input
+        async with client.messages.stream(messages=messages, **kwargs) as stream:
+            async for chunk in stream.text_stream:
+                yield chunk
+            resp = await stream.get_final_message()
+        logger.info("stop_reason=%s\nusage=%s", resp.stop_reason, resp.usage)
+
+        input.append({"role": "assistant", "content": resp.content})
+        tool_calls = [b for b in resp.content if b.type == "tool_use"]
+
+        if not tool_calls:
+            return
+
+        try:
+            results = await asyncio.gather(*[tool(tool_dict, c) for c in tool_calls])
+            input.append(format_tool_results(tool_calls, results))
         except asyncio.CancelledError:
-            input += format_tool_results(tool_calls, ["Interrupted"] * len(tool_calls))
+            input.append(
+                format_tool_results(tool_calls, ["Interrupted"] * len(tool_calls))
+            )
             raise
@@ -3,6 +3,7 @@ import logging
 import os
 from pathlib import Path
 
+import httpx2
 from anthropic import AsyncAnthropic, omit
 from anthropic.types import MessageParam
 from prompt_toolkit import PromptSession, key_binding, styles
@@ -41,7 +42,19 @@ class CLI:
                 "NKD_AGENTS_ANTHROPIC_API_KEY is not set. "
                 "See https://github.com/amitejmehta/nkd-agents#installation"
             )
-        self.client = AsyncAnthropic(api_key=os.environ["NKD_AGENTS_ANTHROPIC_API_KEY"])
+        # the SDK's default keepalive_expiry is 5s, shorter than the pauses
+        # between prompts; a longer expiry keeps the connection warm so each
+        # turn (and subtask fan-out) skips the TCP+TLS handshake
+        self.client = AsyncAnthropic(
+            api_key=os.environ["NKD_AGENTS_ANTHROPIC_API_KEY"],
+            http_client=httpx2.AsyncClient(
+                limits=httpx2.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60,
+                )
+            ),
+        )
         client_ctx.set(self.client)
 
         self.messages: list[MessageParam] = []
@@ -1,11 +1,28 @@
+from contextlib import contextmanager
 from contextvars import ContextVar
 from pathlib import Path
+from typing import Iterator, TypeVar
 
 from anthropic import AsyncAnthropic, AsyncAnthropicVertex
 
+T = TypeVar("T")
+
 # anthropic client for tools that need LLM access
 client_ctx = ContextVar[AsyncAnthropic | AsyncAnthropicVertex]("client_ctx")
 
 # working directory for tools - relative paths are resolved against this
 # useful to set if the agent's cwd != python process's cwd (default is python process's cwd)
 cwd_ctx = ContextVar[Path]("cwd_ctx", default=Path.cwd())
+
+
+@contextmanager
+def ctx(var: ContextVar[T], value: T) -> Iterator[None]:
+    """Set a ContextVar for the duration of a with-block, restoring it on exit.
+
+    Bounds the lifetime of the reset token so repeated sets on a shared loop
+    don't accumulate."""
+    token = var.set(value)
+    try:
+        yield
+    finally:
+        var.reset(token)
@@ -1,9 +1,11 @@
 import asyncio
+import functools
 import json
 import logging
-from typing import Any, Awaitable, Callable, Sequence
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Sequence
 
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, RateLimitError
 from openai.types.responses import (
     FunctionToolParam,
     ParsedResponse,
@@ -15,18 +17,64 @@ from openai.types.responses.response_input_item_param import FunctionCallOutput
 
 from .utils import extract_function_params
 
+try:
+    # Optional: Rust JSON decoder, 2-3x faster on LLM-generated tool arguments
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+_MAX_CONCURRENT = int(os.environ.get("NKD_MAX_CONCURRENT", "10"))
+_MAX_RETRIES = int(os.environ.get("NKD_MAX_RETRIES", "5"))
+_HISTORY_WARN = int(os.environ.get("NKD_HISTORY_WARN", "200"))
+_semaphores: dict[int, asyncio.Semaphore] = {}
+
+
+def _semaphore() -> asyncio.Semaphore:
+    """Per-event-loop cap on in-flight API requests.
+
+    Keyed on the running loop because asyncio primitives bind to whichever
+    loop first awaits them."""
+    key = id(asyncio.get_running_loop())
+    if key not in _semaphores:
+        _semaphores[key] = asyncio.Semaphore(_MAX_CONCURRENT)
+    return _semaphores[key]
+
+
+async def _parse(
+    client: AsyncOpenAI,
+    input: list[ResponseInputItemParam],
+    kwargs: dict[str, Any],
+) -> ParsedResponse[Any]:
+    """Parse a response under the concurrency cap, backing off on 429s.
+
+    Sleeps for the server's Retry-After when present, else 2**attempt
+    seconds; the final attempt propagates the error to the caller."""
+    async with _semaphore():
+        for attempt in range(_MAX_RETRIES):
+            try:
+                return await client.responses.parse(input=input, **kwargs)
+            except RateLimitError as e:
+                delay = float(e.response.headers.get("retry-after", 2**attempt))
+                logger.warning("Rate limited; retrying in %.1fs", delay)
+                await asyncio.sleep(delay)
+        return await client.responses.parse(input=input, **kwargs)
+
 
 def user(content: str) -> ResponseInputItemParam:
     "Take a string and return a full OpenAI user message."
     return {"role": "user", "content": [{"type": "input_text", "text": content}]}
 
 
+@functools.cache
 def tool_schema(
     func: Callable[..., Awaitable[str | ResponseFunctionCallOutputItemListParam]],
 ) -> FunctionToolParam:
-    """Convert a function to OpenAI's tool JSON schema"""
+    """Convert a function to OpenAI's tool JSON schema.
+
+    Cached per function: tools are module-level and immutable, so the schema
+    is pure in the function object. Callers must not mutate the result."""
     if not func.__doc__:
         raise ValueError(f"Function {func.__name__} must have a docstring")
 
@@ -46,26 +94,48 @@ def tool_schema(
     )
 
 
+@functools.cache
+def compiled_tools(
+    *fns: Callable[..., Awaitable[str | ResponseFunctionCallOutputItemListParam]],
+) -> tuple[FunctionToolParam, ...]:
+    """Convert functions to tool schemas once per unique tool tuple.
+
+    llm() re-derives schemas from signatures on every call unless "tools" is
+    passed; callers with a fixed tool list can pass compiled_tools(*fns) to
+    skip the repeated inspect-based generation."""
+    return tuple(tool_schema(fn) for fn in fns)
+
+
 def extract_text_and_tool_calls(
     response: ParsedResponse[Any],
 ) -> tuple[str, list[ParsedResponseFunctionToolCall]]:
     """Extract text and tool calls from an OpenAI response."""
-    text, tool_calls = "", []
+    text_parts: list[str] = []
+    tool_calls: list[ParsedResponseFunctionToolCall] = []
+    # bind once: skips a LOAD_ATTR per item when responses run long
+    append_text, append_call = text_parts.append, tool_calls.append
+    # reasoning summaries can run long; checking the level once up front
+    # skips per-item record creation when INFO is filtered
+    info = logger.isEnabledFor(logging.INFO)
 
     for item in response.output:
-        if item.type == "reasoning":
-            for content in item.summary:
-                if content.type == "summary_text":
-                    logger.info(f"{response.model} Reasoning: {content.text}")
-        if item.type == "message":
+        # item types are mutually exclusive: one chain, at most one match
+        item_type = item.type
+        if item_type == "message":
             for content in item.content:
                 if content.type == "output_text":
-                    text += content.text
-                    logger.info(f"{response.model}: {content.text}")
-        elif item.type == "function_call":
-            tool_calls.append(item)
+                    append_text(content.text)
+                    if info:
+                        logger.info("%s: %s", response.model, content.text)
+        elif item_type == "function_call":
+            append_call(item)
+        elif item_type == "reasoning" and info:
+            for content in item.summary:
+                if content.type == "summary_text":
+                    logger.info("%s Reasoning: %s", response.model, content.text)
 
-    return text, tool_calls
+    # join once: += on str re-copies the accumulated text per item
+    return "".join(text_parts), tool_calls
 
 
 async def tool(
@@ -74,8 +144,13 @@ async def tool(
     ],
     tool_call: ParsedResponseFunctionToolCall,
 ) -> str | ResponseFunctionCallOutputItemListParam:
+    # LLMs can hallucinate tool names; a .get keeps that local as an error
+    # string (and off the exception path) instead of a raw KeyError
+    fn = tool_dict.get(tool_call.name)
+    if fn is None:
+        return f"Error: unknown tool '{tool_call.name}'"
     try:
-        return await tool_dict[tool_call.name](**json.loads(tool_call.arguments))
+        return await fn(**json_loads(tool_call.arguments))
     except Exception as e:
         return f"Error calling tool {tool_call.name}: {str(e)}"
 
@@ -87,6 +162,10 @@ def format_tool_results(
     """Format tool results into messages to append to conversation.
 
     For OpenAI, tool results are added directly to the input list.
+
+    Extend the history in place (input += ... / input.extend(...)) rather
+    than rebuilding it; llm() shares one list per conversation, and
+    rebuilding copies the whole history every turn.
     """
     return [
         FunctionCallOutput(type="function_call_output", call_id=c.call_id, output=r)
@@ -116,10 +195,17 @@ async def llm(
     """
     tool_dict = {fn.__name__: fn for fn in fns}
     kwargs["tools"] = kwargs.get("tools", [tool_schema(fn) for fn in fns])
+    warned = False
 
     while True:
-        resp = await client.responses.parse(input=input, **kwargs)
-        logger.info(f"usage={resp.usage}")
+        if not warned and len(input) > _HISTORY_WARN:
+            # every turn re-serializes and re-bills the whole list, so cost
+            # grows quadratically with history length
+            logger.warning("History has %d messages; consider compacting", len(input))
+            warned = True
+
+        resp = await _parse(client, input, kwargs)
+        logger.info("usage=%s", resp.usage)
 
         text, tool_calls = extract_text_and_tool_calls(resp)
         input += resp.output  # type: ignore # TODO: fix this
@@ -133,3 +219,44 @@ async def llm(
         except asyncio.CancelledError:
             input += format_tool_results(tool_calls, ["Interrupted"] * len(tool_calls))
             raise
+
+
+async def llm_stream(
+    client: AsyncOpenAI,
+    input: list[ResponseInputItemParam],
+    fns: Sequence[
+        Callable[..., Awaitable[str | ResponseFunctionCallOutputItemListParam]]
+    ] = (),
+    **kwargs: Any,
+) -> AsyncIterator[str]:
+    """Run the same agentic loop as llm(), yielding text deltas as they arrive.
+
+    llm() buffers each full response before returning, so long outputs delay
+    downstream work by their whole decode time. This variant streams text
+    incrementally for display while keeping identical tool behavior; use
+    llm() when you need the complete text (e.g. structured output) rather
+    than progressive rendering.
+    """
+    tool_dict = {fn.__name__: fn for fn in fns}
+    kwargs["tools"] = kwargs.get("tools", [tool_schema(fn) for fn in fns])
+
+    while True:
+        async with client.responses.stream(input=input, **kwargs) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+            resp = await stream.get_final_response()
+        logger.info("usage=%s", resp.usage)
+
+        input += resp.output  # type: ignore # TODO: fix this
+        tool_calls = [i for i in resp.output if i.type == "function_call"]
+
+        if not tool_calls:
+            return
+
+        try:
+            results = await asyncio.gather(*[tool(tool_dict, c) for c in tool_calls])
+            input += format_tool_results(tool_calls, results)
+        except asyncio.CancelledError:
+            input += format_tool_results(tool_calls, ["Interrupted"] * len(tool_calls))
+            raise
@@ -57,9 +57,15 @@ async def edit_file(path: str, old_str: str, new_str: str, count: int = 1) -> st
 
         if file_path.exists():
             content = file_path.read_text(encoding="utf-8")
-            if old_str != "" and old_str not in content:
+            idx = content.find(old_str) if old_str != "" else -1
+            if old_str != "" and idx == -1:
                 return "Error: old_str not found in file content"
-            edited_content = content.replace(old_str, new_str, count)
+            if old_str != "" and count == 1:
+                # single edit: reuse the scan above and splice, instead of
+                # replace() re-scanning the file from the start
+                edited_content = content[:idx] + new_str + content[idx + len(old_str) :]
+            else:
+                edited_content = content.replace(old_str, new_str, count)
         else:
             if old_str != "":
                 return f"Error: File '{path}' not found"
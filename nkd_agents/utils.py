@@ -1,4 +1,5 @@
 import difflib
+import functools
 import inspect
 import logging
 import os
@@ -10,9 +11,16 @@ from .logging import GREEN, RED, RESET
 
 logger = logging.getLogger(__name__)
 
+# built once: every schema extraction reads this, none mutate it
+_TYPE_MAP = {str: "string", int: "integer", float: "number", bool: "boolean"}
 
+
+@functools.cache
 def load_env(path: str = ".env") -> None:
-    """Load environment variables from a file."""
+    """Load environment variables from a file.
+
+    Cached per path: the file is parsed at most once per process, so repeated
+    calls (e.g. one per example in a shared-process run) are free."""
     if not Path(path).exists():
         return
     for line in Path(path).read_text().splitlines():
@@ -52,32 +60,35 @@ def process_param_annotation(annotation: Any, param_sig: str) -> dict[str, Any]:
     """Convert a parameter annotation to JSON schema.
     Supports core types: str, int, float, bool as well as list[T] and Literal of core types.
     """
-    type_map = {str: "string", int: "integer", float: "number", bool: "boolean"}
-
     origin, args = get_origin(annotation), get_args(annotation)
 
     if origin is Literal:
-        return _handle_literal_annotation(args, param_sig, type_map)
+        return _handle_literal_annotation(args, param_sig, _TYPE_MAP)
     elif origin is types.UnionType:
         if len(args) != 2 or args[1] is not type(None):
             raise ValueError(f"Only T | None unions supported: {param_sig}")
         return process_param_annotation(args[0], param_sig)
     elif origin is list:
-        return _handle_list_annotation(args, param_sig, type_map)
+        return _handle_list_annotation(args, param_sig, _TYPE_MAP)
     elif annotation is list or annotation is List:
         raise ValueError(f"List must have type parameter: {param_sig}")
-    elif annotation is not inspect._empty and annotation not in type_map:
+    elif annotation is not inspect._empty and annotation not in _TYPE_MAP:
         raise ValueError(f"Unsupported type: {param_sig}")
     else:
-        return {"type": type_map.get(annotation, "string")}
+        return {"type": _TYPE_MAP.get(annotation, "string")}
 
 
+@functools.cache
 def extract_function_params(
     func: Callable[..., Any],
 ) -> tuple[dict[str, Any], list[str]]:
     """Extract parameter schema and required list from a function signature.
     Supports core types: str, int, float, bool, list[T] of core types, and Literal of core types.
 
+    Cached per function (identity): inspect.signature walks annotations and
+    allocates Parameter objects on every call, so repeated schema builds for
+    the same tool would otherwise re-pay that reflection each LLM round.
+
     Returns:
         tuple: (params_dict, required_list)
             - params_dict: Maps parameter names to their type definitions
@@ -16,6 +16,19 @@ from .logging import GREEN, RESET
 
 logger = logging.getLogger(__name__)
 
+_http_client: httpx.AsyncClient | None = None
+
+
+def _client() -> httpx.AsyncClient:
+    """Lazily create the HTTP client shared by all fetches.
+
+    One client means one connection pool: repeated fetch_url calls in an
+    agentic loop reuse sockets instead of paying DNS + TLS per call."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(follow_redirects=True, timeout=30.0)
+    return _http_client
+
 
 async def web_search(query: str, max_results: int = 5) -> str:
     """Search the web and return results.
@@ -77,10 +90,9 @@ async def fetch_url(url: str, save_path: str) -> str:
     """
     try:
         logger.info(f"Fetching: {GREEN}{url}{RESET}")
-        async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            html = response.text
+        response = await _client().get(url)
+        response.raise_for_status()
+        html = response.text
 
         markdown = trafilatura.extract(
             html,
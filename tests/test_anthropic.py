@@ -1,4 +1,9 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
 import pytest
+from anthropic import RateLimitError
 from anthropic.types import (
     Message,
     TextBlock,
@@ -9,8 +14,13 @@ from anthropic.types import (
 from pydantic import BaseModel
 
 from nkd_agents.anthropic import (
+    _create,
+    _with_cache_breakpoints,
+    assistant,
+    compiled_tools,
     extract_text_and_tool_calls,
     format_tool_results,
+    llm_batch,
     output_config,
     tool,
     tool_schema,
@@ -27,6 +37,28 @@ def test_user():
     }
 
 
+def test_assistant():
+    """Test assistant message formatting"""
+    result = assistant("Let me check...")
+    assert result == {
+        "role": "assistant",
+        "content": [{"type": "text", "text": "Let me check..."}],
+    }
+
+
+def test_with_cache_breakpoints():
+    """Test the overlay marks the last two messages without mutating input"""
+    input = [user("first"), user("second"), user("third")]
+
+    messages = _with_cache_breakpoints(input)
+
+    assert messages[-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert messages[-2]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in messages[0]["content"][-1]
+    # input itself must stay untouched so its prefix is stable across turns
+    assert input == [user("first"), user("second"), user("third")]
+
+
 def test_output_config():
     """Test output_config generates proper JSON schema config"""
 
@@ -58,6 +90,7 @@ def test_tool_schema():
     assert "limit" in schema["input_schema"]["properties"]
     assert schema["input_schema"]["required"] == ["query"]
     assert schema["strict"] is True
+    assert tool_schema(example_tool) is schema
 
 
 def test_tool_schema_requires_docstring():
@@ -70,6 +103,18 @@ def test_tool_schema_requires_docstring():
         tool_schema(no_docstring)
 
 
+def test_compiled_tools_cached():
+    """Test compiled_tools builds schemas once and caches per tool tuple"""
+
+    async def example_tool(query: str) -> str:
+        """Search for something"""
+        return query
+
+    schemas = compiled_tools(example_tool)
+    assert schemas == (tool_schema(example_tool),)
+    assert compiled_tools(example_tool) is schemas
+
+
 def test_extract_text_and_tool_calls_text_only():
     """Test extracting text from response with no tool calls"""
     message = Message(
@@ -177,6 +222,82 @@ async def test_tool_error_handling():
     assert "Something went wrong" in result
 
 
+@pytest.mark.asyncio
+async def test_create_retries_on_rate_limit():
+    """Test _create backs off on 429 and honors the Retry-After header"""
+    response = httpx.Response(
+        429,
+        headers={"retry-after": "0"},
+        request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"),
+    )
+    error = RateLimitError("rate limited", response=response, body=None)
+
+    client = MagicMock()
+    client.messages.create = AsyncMock(side_effect=[error, "message"])
+
+    result = await _create(client, [user("Hi")], {"model": "m", "max_tokens": 8})
+    assert result == "message"
+    assert client.messages.create.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_llm_batch():
+    """Test llm_batch submits requests, polls to completion, and orders results"""
+    message = Message(
+        id="msg_1",
+        type="message",
+        role="assistant",
+        content=[TextBlock(type="text", text="Hello, world!")],
+        model="claude-3-5-sonnet-20241022",
+        stop_reason="end_turn",
+        usage=Usage(input_tokens=10, output_tokens=5),
+    )
+    entries = [
+        SimpleNamespace(
+            custom_id="1", result=SimpleNamespace(type="errored", error="overloaded")
+        ),
+        SimpleNamespace(
+            custom_id="0", result=SimpleNamespace(type="succeeded", message=message)
+        ),
+    ]
+
+    async def results():
+        for entry in entries:
+            yield entry
+
+    client = MagicMock()
+    client.messages.batches.create = AsyncMock(
+        return_value=SimpleNamespace(id="batch_1", processing_status="in_progress")
+    )
+    client.messages.batches.retrieve = AsyncMock(
+        return_value=SimpleNamespace(id="batch_1", processing_status="ended")
+    )
+    client.messages.batches.results = AsyncMock(return_value=results())
+
+    inputs = [[user("Hi")], [user("Hello")]]
+    texts = await llm_batch(client, inputs, poll_interval=0, model="m", max_tokens=8)
+
+    assert texts == ["Hello, world!", "Error: overloaded"]
+    requests = client.messages.batches.create.call_args.kwargs["requests"]
+    assert [r["custom_id"] for r in requests] == ["0", "1"]
+    assert requests[0]["params"]["model"] == "m"
+    client.messages.batches.retrieve.assert_awaited_once_with("batch_1")
+
+
+@pytest.mark.asyncio
+async def test_tool_unknown_name():
+    """Test hallucinated tool names return an error string, not a KeyError"""
+    tool_call = ToolUseBlock(
+        type="tool_use",
+        id="tool_1",
+        name="no_such_tool",
+        input={},
+    )
+
+    result = await tool({}, tool_call)
+    assert result == "Error: unknown tool 'no_such_tool'"
+
+
 def test_format_tool_results_string():
     """Test formatting string tool results"""
     tool_calls = [
@@ -190,11 +311,10 @@ def test_format_tool_results_string():
     results = ["Search results here"]
 
     formatted = format_tool_results(tool_calls, results)
-    assert len(formatted) == 1
-    assert formatted[0]["role"] == "user"
-    assert len(formatted[0]["content"]) == 1
-    assert formatted[0]["content"][0]["type"] == "tool_result"
-    assert formatted[0]["content"][0]["tool_use_id"] == "tool_1"
+    assert formatted["role"] == "user"
+    assert len(formatted["content"]) == 1
+    assert formatted["content"][0]["type"] == "tool_result"
+    assert formatted["content"][0]["tool_use_id"] == "tool_1"
 
 
 def test_format_tool_results_content_blocks():
@@ -210,10 +330,9 @@ def test_format_tool_results_content_blocks():
     results = [[{"type": "text", "text": "File content"}]]
 
     formatted = format_tool_results(tool_calls, results)
-    assert len(formatted) == 1
-    assert formatted[0]["role"] == "user"
-    assert formatted[0]["content"][0]["type"] == "tool_result"
-    assert formatted[0]["content"][0]["content"] == [
+    assert formatted["role"] == "user"
+    assert formatted["content"][0]["type"] == "tool_result"
+    assert formatted["content"][0]["content"] == [
         {"type": "text", "text": "File content"}
     ]
 
@@ -227,7 +346,6 @@ def test_format_tool_results_multiple():
     results = ["result1", "result2"]
 
     formatted = format_tool_results(tool_calls, results)
-    assert len(formatted) == 1
-    assert len(formatted[0]["content"]) == 2
-    assert formatted[0]["content"][0]["tool_use_id"] == "tool_1"
-    assert formatted[0]["content"][1]["tool_use_id"] == "tool_2"
+    assert len(formatted["content"]) == 2
+    assert formatted["content"][0]["tool_use_id"] == "tool_1"
+    assert formatted["content"][1]["tool_use_id"] == "tool_2"
@@ -0,0 +1,24 @@
+from contextvars import ContextVar
+
+from nkd_agents.ctx import ctx
+
+
+def test_ctx_sets_and_restores():
+    """Test ctx() scopes a ContextVar to the with-block"""
+    var = ContextVar[str]("var", default="default")
+
+    with ctx(var, "scoped"):
+        assert var.get() == "scoped"
+    assert var.get() == "default"
+
+
+def test_ctx_restores_on_error():
+    """Test ctx() restores the previous value even if the body raises"""
+    var = ContextVar[str]("var", default="default")
+
+    try:
+        with ctx(var, "scoped"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert var.get() == "default"
@@ -9,6 +9,7 @@ from openai.types.responses import (
 from openai.types.responses.response_reasoning_item import Summary
 
 from nkd_agents.openai import (
+    compiled_tools,
     extract_text_and_tool_calls,
     format_tool_results,
     tool,
@@ -66,6 +67,7 @@ def test_tool_schema():
     assert "limit" in schema["parameters"]["properties"]
     assert schema["parameters"]["required"] == ["query"]
     assert schema["strict"] is True
+    assert tool_schema(example_tool) is schema
 
 
 def test_tool_schema_requires_docstring():
@@ -78,6 +80,18 @@ def test_tool_schema_requires_docstring():
         tool_schema(no_docstring)
 
 
+def test_compiled_tools_cached():
+    """Test compiled_tools builds schemas once and caches per tool tuple"""
+
+    async def example_tool(query: str) -> str:
+        """Search for something"""
+        return query
+
+    schemas = compiled_tools(example_tool)
+    assert schemas == (tool_schema(example_tool),)
+    assert compiled_tools(example_tool) is schemas
+
+
 def test_extract_text_and_tool_calls_text_only():
     """Test extracting text from response with no tool calls"""
     msg = ResponseOutputMessage(
@@ -196,6 +210,22 @@ async def test_tool_error_handling():
     assert "Something went wrong" in result
 
 
+@pytest.mark.asyncio
+async def test_tool_unknown_name():
+    """Test hallucinated tool names return an error string, not a KeyError"""
+    tool_call = ResponseFunctionToolCall(
+        type="function_call",
+        id="fc_1",
+        call_id="call_1",
+        name="no_such_tool",
+        arguments="{}",
+        status="completed",
+    )
+
+    result = await tool({}, tool_call)
+    assert result == "Error: unknown tool 'no_such_tool'"
+
+
 def _tool_call(
     call_id: str, name: str = "test", arguments: str = "{}"
 ) -> ResponseFunctionToolCall:
@@ -195,6 +195,15 @@ class TestExtractFunctionParams:
         assert len(params) == 0
         assert len(required_list) == 0
 
+    @pytest.mark.asyncio
+    async def test_cached_per_function(self):
+        """Repeated extraction for the same function returns the cached result."""
+
+        async def func(name: str):
+            pass
+
+        assert extract_function_params(func) is extract_function_params(func)
+
     @pytest.mark.asyncio
     async def test_parameter_names_preserved(self):
         """Parameter names are preserved exactly."""
@@ -5,9 +5,18 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import httpx
 import pytest
 
+import nkd_agents.web as web
 from nkd_agents.web import fetch_url
 
 
+@pytest.fixture(autouse=True)
+def reset_client():
+    """Drop the shared client so each test gets a fresh mock."""
+    web._http_client = None
+    yield
+    web._http_client = None
+
+
 @pytest.fixture
 def mock_cwd(tmp_path):
     """Set cwd_ctx to a temp directory."""
@@ -26,8 +35,7 @@ def mock_httpx_success():
 
         client = AsyncMock()
         client.get = AsyncMock(return_value=response)
-        client.__aenter__ = AsyncMock(return_value=client)
-        client.__aexit__ = AsyncMock(return_value=None)
+        client.is_closed = False
         mock.return_value = client
         yield response
 
@@ -66,8 +74,7 @@ async def test_fetch_url_http_error(mock_cwd):
                 "Not Found", request=MagicMock(), response=MagicMock()
             )
         )
-        client.__aenter__ = AsyncMock(return_value=client)
-        client.__aexit__ = AsyncMock(return_value=None)
+        client.is_closed = False
         mock.return_value = client
 
         result = await fetch_url("https://example.com/404", "output.md")